@@ -1,24 +1,40 @@
 import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.pool import NullPool, StaticPool
 
 
 db = SQLAlchemy()
 
 
+def engine_options(database_url: str) -> dict:
+    if database_url.startswith("sqlite"):
+        if database_url in ("sqlite://", "sqlite:///:memory:"):
+            # An in-memory database only exists on its single connection.
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        # Pooled SQLite connections keep transactions (and file locks) open between
+        # the scheduler thread and web requests; a fresh connection is cheap.
+        return {"poolclass": NullPool}
+    return {"pool_pre_ping": True, "pool_recycle": 1800, "pool_size": 5, "max_overflow": 10}
+
+
 def create_app():
     app = Flask(
         __name__, template_folder="../templates", static_folder="../static"
     )
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///app.db")
+    database_url = os.getenv("DATABASE_URL", "sqlite:///app.db")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(database_url)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
+    app.config["RUN_SCHEDULER"] = (
+        os.getenv("RUN_SCHEDULER", "1") == "1" and not os.getenv("FLASK_SKIP_SCHEDULER")
+    )
 
     db.init_app(app)
 
     with app.app_context():
         from .routes import bp
-        from .scheduler import init_scheduler
         from .models import User
         from .db_migrations import run_migrations
 
@@ -26,6 +42,10 @@ def create_app():
         run_migrations(db.engine)
         User.ensure_default_admin()
         app.register_blueprint(bp)
-        init_scheduler(app)
+        if app.config["RUN_SCHEDULER"]:
+            # APScheduler is only imported by processes that actually run jobs.
+            from .scheduler import init_scheduler
+
+            init_scheduler(app)
 
     return app
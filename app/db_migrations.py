@@ -1,50 +1,111 @@
 from __future__ import annotations
 
 from sqlalchemy import inspect, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.reflection import Inspector
+
+# Bump whenever a new ensure_* step is added to run_migrations.
+CURRENT_SCHEMA_VERSION = 4
+
+# SQLite only accepts one ADD COLUMN per ALTER TABLE statement.
+MULTI_ADD_COLUMN_DIALECTS = {"postgresql", "mysql", "mariadb"}
+
+CLIENT_SUBJECT_COLUMNS = [
+    ("expected_subject_ok", "VARCHAR(512)"),
+    ("expected_subject_warning", "VARCHAR(512)"),
+    ("expected_subject_failed", "VARCHAR(512)"),
+]
+
+CLIENT_STATE_COLUMNS = [
+    ("last_statuses", "TEXT"),
+    ("last_email_count", "INTEGER DEFAULT 0 NOT NULL"),
+]
+
+EMAIL_CONFIG_REPORT_COLUMNS = [
+    ("report_recipients", "TEXT"),
+    ("auto_report_enabled", "BOOLEAN DEFAULT 0 NOT NULL"),
+    ("check_schedule_hour", "INTEGER DEFAULT 9 NOT NULL"),
+    ("check_schedule_minute", "INTEGER DEFAULT 0 NOT NULL"),
+    ("report_schedule_hour", "INTEGER DEFAULT 9 NOT NULL"),
+    ("report_schedule_minute", "INTEGER DEFAULT 30 NOT NULL"),
+    ("check_window_start_hour", "INTEGER DEFAULT 16 NOT NULL"),
+    ("check_window_end_hour", "INTEGER DEFAULT 9 NOT NULL"),
+]
 
 
 def run_migrations(engine: Engine) -> None:
-    ensure_client_subject_columns(engine)
-    ensure_email_config_report_columns(engine)
+    with engine.connect() as connection:
+        if _current_version(connection) >= CURRENT_SCHEMA_VERSION:
+            return
 
-
-def ensure_client_subject_columns(engine: Engine) -> None:
     inspector = inspect(engine)
-    if "client" not in inspector.get_table_names():
+    tables = set(inspector.get_table_names())
+    ensure_client_subject_columns(engine, inspector, tables)
+    ensure_email_config_report_columns(engine, inspector, tables)
+    ensure_client_name_index(engine, inspector, tables)
+    ensure_log_entry_created_at_index(engine, inspector, tables)
+    drop_client_expected_subject(engine, inspector, tables)
+    _store_version(engine, CURRENT_SCHEMA_VERSION)
+
+
+def _current_version(connection: Connection) -> int:
+    try:
+        version = connection.execute(
+            text("SELECT version FROM schema_version LIMIT 1")
+        ).scalar()
+    except SQLAlchemyError:
+        return 0
+    return version or 0
+
+
+def _store_version(engine: Engine, version: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        )
+        connection.execute(text("DELETE FROM schema_version"))
+        connection.execute(
+            text("INSERT INTO schema_version (version) VALUES (:version)"),
+            {"version": version},
+        )
+
+
+def add_columns(connection: Connection, table: str, columns: list[tuple[str, str]]) -> None:
+    if not columns:
         return
 
-    columns = {column["name"] for column in inspector.get_columns("client")}
-    columns_added: list[str] = []
+    if connection.dialect.name in MULTI_ADD_COLUMN_DIALECTS:
+        clauses = ", ".join(f"ADD COLUMN {name} {definition}" for name, definition in columns)
+        connection.execute(text(f"ALTER TABLE {table} {clauses}"))
+        return
 
-    with engine.begin() as connection:
-        if "expected_subject_ok" not in columns:
-            connection.execute(
-                text("ALTER TABLE client ADD COLUMN expected_subject_ok VARCHAR(512)")
-            )
-            columns_added.append("expected_subject_ok")
+    for name, definition in columns:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
 
-        if "expected_subject_warning" not in columns:
-            connection.execute(
-                text("ALTER TABLE client ADD COLUMN expected_subject_warning VARCHAR(512)")
-            )
-            columns_added.append("expected_subject_warning")
 
-        if "expected_subject_failed" not in columns:
-            connection.execute(
-                text("ALTER TABLE client ADD COLUMN expected_subject_failed VARCHAR(512)")
-            )
-            columns_added.append("expected_subject_failed")
+def ensure_client_subject_columns(
+    engine: Engine, inspector: Inspector, tables: set[str]
+) -> None:
+    if "client" not in tables:
+        return
 
-        if "last_statuses" not in columns:
-            connection.execute(text("ALTER TABLE client ADD COLUMN last_statuses TEXT"))
+    columns = {column["name"] for column in inspector.get_columns("client")}
+    subject_columns_added = [
+        (name, definition)
+        for name, definition in CLIENT_SUBJECT_COLUMNS
+        if name not in columns
+    ]
+    state_columns_added = [
+        (name, definition)
+        for name, definition in CLIENT_STATE_COLUMNS
+        if name not in columns
+    ]
 
-        if "last_email_count" not in columns:
-            connection.execute(
-                text("ALTER TABLE client ADD COLUMN last_email_count INTEGER DEFAULT 0 NOT NULL")
-            )
+    with engine.begin() as connection:
+        add_columns(connection, "client", subject_columns_added + state_columns_added)
 
-        if columns_added:
+        if subject_columns_added:
             connection.execute(
                 text(
                     """
@@ -58,68 +119,123 @@ def ensure_client_subject_columns(engine: Engine) -> None:
             )
 
 
-def ensure_email_config_report_columns(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "email_config" not in inspector.get_table_names():
+def ensure_email_config_report_columns(
+    engine: Engine, inspector: Inspector, tables: set[str]
+) -> None:
+    if "email_config" not in tables:
         return
 
     columns = {column["name"] for column in inspector.get_columns("email_config")}
+    columns_added = [
+        (name, definition)
+        for name, definition in EMAIL_CONFIG_REPORT_COLUMNS
+        if name not in columns
+    ]
 
     with engine.begin() as connection:
-        if "report_recipients" not in columns:
-            connection.execute(
-                text("ALTER TABLE email_config ADD COLUMN report_recipients TEXT")
-            )
+        add_columns(connection, "email_config", columns_added)
 
-        if "auto_report_enabled" not in columns:
-            connection.execute(
-                text("ALTER TABLE email_config ADD COLUMN auto_report_enabled BOOLEAN DEFAULT 0 NOT NULL")
-            )
 
-        if "check_schedule_hour" not in columns:
-            connection.execute(
-                text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN check_schedule_hour INTEGER DEFAULT 9 NOT NULL"
-                )
-            )
+def ensure_client_name_index(engine: Engine, inspector: Inspector, tables: set[str]) -> None:
+    if "client" not in tables:
+        return
 
-        if "check_schedule_minute" not in columns:
-            connection.execute(
-                text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN check_schedule_minute INTEGER DEFAULT 0 NOT NULL"
-                )
-            )
+    # create_all only builds ix_client_name for a fresh table.
+    indexed = any(
+        index["column_names"][:1] == ["name"] for index in inspector.get_indexes("client")
+    )
+    if indexed:
+        return
 
-        if "report_schedule_hour" not in columns:
-            connection.execute(
-                text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN report_schedule_hour INTEGER DEFAULT 9 NOT NULL"
-                )
-            )
+    with engine.begin() as connection:
+        connection.execute(text("CREATE INDEX ix_client_name ON client (name)"))
 
-        if "report_schedule_minute" not in columns:
-            connection.execute(
-                text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN report_schedule_minute INTEGER DEFAULT 30 NOT NULL"
-                )
-            )
 
-        if "check_window_start_hour" not in columns:
-            connection.execute(
-                text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN check_window_start_hour INTEGER DEFAULT 16 NOT NULL"
-                )
+def ensure_log_entry_created_at_index(
+    engine: Engine, inspector: Inspector, tables: set[str]
+) -> None:
+    if "log_entry" not in tables:
+        return
+
+    indexed = any(
+        index["column_names"][:1] == ["created_at"]
+        for index in inspector.get_indexes("log_entry")
+    )
+    if indexed:
+        return
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE INDEX ix_log_entry_created_at ON log_entry (created_at)")
+        )
+
+
+def drop_client_expected_subject(
+    engine: Engine, inspector: Inspector, tables: set[str]
+) -> None:
+    if "client" not in tables:
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("client")}
+    if "expected_subject" not in columns:
+        return
+
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                UPDATE client
+                SET expected_subject_ok = expected_subject
+                WHERE expected_subject_ok IS NULL OR expected_subject_ok = ''
+                """
             )
+        )
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE client DROP COLUMN expected_subject"))
+    except OperationalError:
+        # SQLite only learned DROP COLUMN in 3.35.
+        if engine.dialect.name != "sqlite":
+            raise
+        rebuild_sqlite_table_without(engine, "client", "expected_subject")
+
 
-        if "check_window_end_hour" not in columns:
+def rebuild_sqlite_table_without(engine: Engine, table: str, dropped: str) -> None:
+    # SQLite's documented fallback: copy the kept columns into a new table,
+    # swap it in, then recreate the indexes.
+    inspector = inspect(engine)
+    columns = [column for column in inspector.get_columns(table) if column["name"] != dropped]
+    indexes = [
+        index
+        for index in inspector.get_indexes(table)
+        if dropped not in index["column_names"]
+    ]
+
+    definitions = []
+    for column in columns:
+        definition = f"{column['name']} {column['type'].compile(dialect=engine.dialect)}"
+        if column["primary_key"]:
+            definition += " PRIMARY KEY"
+        elif not column["nullable"]:
+            definition += " NOT NULL"
+        if column["default"] is not None:
+            definition += f" DEFAULT {column['default']}"
+        definitions.append(definition)
+    names = ", ".join(column["name"] for column in columns)
+
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE TABLE {table}__new ({', '.join(definitions)})"))
+        connection.execute(
+            text(f"INSERT INTO {table}__new ({names}) SELECT {names} FROM {table}")
+        )
+        connection.execute(text(f"DROP TABLE {table}"))
+        connection.execute(text(f"ALTER TABLE {table}__new RENAME TO {table}"))
+        for index in indexes:
+            unique = "UNIQUE " if index["unique"] else ""
             connection.execute(
                 text(
-                    "ALTER TABLE email_config "
-                    "ADD COLUMN check_window_end_hour INTEGER DEFAULT 9 NOT NULL"
+                    f"CREATE {unique}INDEX {index['name']} "
+                    f"ON {table} ({', '.join(index['column_names'])})"
                 )
             )
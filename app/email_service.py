@@ -1,18 +1,23 @@
-import email
-import html
 import imaplib
+import io
 import os
 import re
-import smtplib
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.header import decode_header
 from email.message import EmailMessage
-from typing import List
+from functools import lru_cache
+from typing import Iterable, Iterator
 from zoneinfo import ZoneInfo
 
 from flask import current_app
+from sqlalchemy.orm import load_only
 
 from . import db
+from .imap_pool import connection_key, get_connection
 from .models import (
     Client,
     EmailConfig,
@@ -21,10 +26,61 @@ from .models import (
     STATUS_OK,
     STATUS_WARNING,
     add_log,
+    flush_logs,
+    get_timezone,
 )
+from .smtp_pool import get_smtp
 
 DEFAULT_WINDOW_START_HOUR = 16
 DEFAULT_WINDOW_END_HOUR = 9
+# BODY.PEEK leaves the \Seen flag untouched and only the Subject line travels
+# over the wire; INTERNALDATE is the server's own, already structured, arrival time.
+HEADER_FETCH_SPEC = "(INTERNALDATE BODY.PEEK[HEADER.FIELDS (SUBJECT)])"
+DEFAULT_FETCH_BATCH_SIZE = 100
+DEFAULT_IMAP_WORKERS = 1
+# Keeps a combined OR search well under common IMAP command length limits.
+SEARCH_TOKENS_PER_COMMAND = 50
+REPORT_CACHE_SIZE = 4
+STATUS_PRIORITY = [STATUS_FAILED, STATUS_WARNING, STATUS_OK]
+_STATUS_RANK = {status: rank for rank, status in enumerate(STATUS_PRIORITY)}
+_MATCHES_KEY = ""
+# The FETCH only returns the Subject line, so it is read directly instead of
+# building an email.message.Message for each header block.
+_HEADER_FIELD_RE = re.compile(
+    rb"^(Subject):[ \t]*(.*(?:\r?\n[ \t].*)*)", re.IGNORECASE | re.MULTILINE
+)
+_HEADER_FOLD_RE = re.compile(rb"\r?\n(?=[ \t])")
+_UID_RE = re.compile(rb"\bUID (\d+)")
+# Same replacements as html.escape(quote=True), applied in a single pass.
+_HTML_ESCAPE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+_RECIPIENT_SEPARATORS = str.maketrans({";": ",", "\n": ",", "\r": ","})
+
+# Checks only read the expected subjects; the report only renders the outcome.
+CHECK_COLUMNS = (
+    Client.id,
+    Client.expected_subject_ok,
+    Client.expected_subject_warning,
+    Client.expected_subject_failed,
+)
+REPORT_COLUMNS = (
+    Client.id,
+    Client.name,
+    Client.last_status,
+    Client.last_subject,
+    Client.last_note,
+    Client.last_statuses,
+    Client.last_email_count,
+    Client.last_checked_at,
+)
+
+# Parsed headers of the last window per mailbox, keyed by UID under a UIDVALIDITY.
+_header_cache: dict[tuple, tuple[bytes, dict[bytes, tuple[str, str, datetime | None]]]] = {}
+
+# Rendered client sections of recent reports, oldest first.
+_report_cache: dict[tuple, str] = {}
+_report_cache_lock = threading.Lock()
 
 
 def _sanitize_hour(value: int | None, default: int) -> int:
@@ -41,95 +97,283 @@ def get_window_hours(config: EmailConfig) -> tuple[int, int]:
     return start_hour, end_hour
 
 
+def get_fetch_batch_size() -> int:
+    try:
+        batch_size = int(os.getenv("IMAP_FETCH_BATCH", DEFAULT_FETCH_BATCH_SIZE))
+    except ValueError:
+        return DEFAULT_FETCH_BATCH_SIZE
+    return max(1, batch_size)
+
+
+def get_imap_workers() -> int:
+    try:
+        workers = int(os.getenv("IMAP_WORKERS", DEFAULT_IMAP_WORKERS))
+    except ValueError:
+        return DEFAULT_IMAP_WORKERS
+    return max(1, workers)
+
+
 def format_window_label(config: EmailConfig) -> str:
     start_hour, end_hour = get_window_hours(config)
     return f"{start_hour:02d}h-{end_hour:02d}h"
 
 
+def format_datetime(value: datetime) -> str:
+    # Same output as strftime("%d/%m/%Y %H:%M") without parsing a format string.
+    return f"{value.day:02d}/{value.month:02d}/{value.year} {value.hour:02d}:{value.minute:02d}"
+
+
+def format_short_datetime(value: datetime) -> str:
+    return f"{value.day:02d}/{value.month:02d} {value.hour:02d}:{value.minute:02d}"
+
+
+@lru_cache(maxsize=256)
 def decode_subject(raw_subject: str) -> str:
-    decoded_parts = decode_header(raw_subject)
-    subject = ""
-    for part, encoding in decoded_parts:
+    if "=?" not in raw_subject:
+        # No RFC 2047 encoded word: decode_header would hand the text back as is.
+        return raw_subject
+    parts = []
+    for part, encoding in decode_header(raw_subject):
         if isinstance(part, bytes):
-            subject += part.decode(encoding or "utf-8", errors="ignore")
-        else:
-            subject += part or ""
-    return subject
+            parts.append(part.decode(encoding or "utf-8", errors="ignore"))
+        elif part:
+            parts.append(part)
+    return "".join(parts)
 
 
-def extract_status_from_subject(subject: str, client: Client) -> str | None:
-    subject_lower = subject.lower().strip()
+def build_subject_patterns(client: Client) -> list[tuple[str, str]]:
     expected_pairs = [
         (STATUS_FAILED, client.subject_failed),
         (STATUS_WARNING, client.subject_warning),
         (STATUS_OK, client.subject_ok),
     ]
-
-    for status, expected in expected_pairs:
-        expected_lower = expected.lower().strip()
-        if expected_lower and subject_lower.startswith(expected_lower):
-            return status
-
-    return None
+    return [
+        (status, expected.lower())
+        for status, expected in expected_pairs
+        if expected
+    ]
 
 
-def parse_email_date(date_header: str | None, tz: ZoneInfo) -> datetime | None:
-    if not date_header:
-        return None
-    try:
-        parsed = email.utils.parsedate_to_datetime(date_header)
-    except Exception:  # noqa: BLE001
-        return None
-    if not parsed:
+def build_subject_matcher(client_patterns: dict[int, list[tuple[str, str]]]) -> dict:
+    # Every expected subject is a prefix, so a single trie dispatches a subject
+    # to all matching clients in one pass over its characters.
+    root: dict = {}
+    for client_id, patterns in client_patterns.items():
+        for status, expected_lower in patterns:
+            node = root
+            for char in expected_lower:
+                node = node.setdefault(char, {})
+            node.setdefault(_MATCHES_KEY, []).append((client_id, status))
+    return root
+
+
+def extract_statuses_from_subject(subject_lower: str, matcher: dict) -> dict[int, str]:
+    statuses: dict[int, str] = {}
+    node = matcher
+    for char in subject_lower:
+        node = node.get(char)
+        if node is None:
+            break
+        for client_id, status in node.get(_MATCHES_KEY, ()):
+            current = statuses.get(client_id)
+            if current is None or _STATUS_RANK[status] < _STATUS_RANK[current]:
+                statuses[client_id] = status
+    return statuses
+
+
+def parse_header_fields(raw_headers: bytes) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    for name, value in _HEADER_FIELD_RE.findall(raw_headers):
+        value = _HEADER_FOLD_RE.sub(b"", value).strip()
+        fields.setdefault(name.decode("ascii").lower(), value.decode("utf-8", errors="replace"))
+    return fields
+
+
+def parse_internal_date(response: bytes, tz: ZoneInfo) -> datetime | None:
+    time_tuple = imaplib.Internaldate2tuple(response)
+    if not time_tuple:
         return None
-    if parsed.tzinfo is None:
-        return parsed.replace(tzinfo=tz)
-    return parsed.astimezone(tz)
+    return datetime.fromtimestamp(time.mktime(time_tuple), tz=tz)
 
 
-def find_matching_subject(
-    message_ids: List[bytes],
-    client: Client,
-    mail: imaplib.IMAP4,
-    start_time: datetime,
-    end_time: datetime,
-    tz: ZoneInfo,
+def collect_subject_tokens(clients: list[Client]) -> list[str]:
+    tokens: dict[str, str] = {}
+    for client in clients:
+        for expected in (client.subject_failed, client.subject_warning, client.subject_ok):
+            if expected:
+                tokens.setdefault(expected.lower(), expected)
+    return list(tokens.values())
+
+
+def _quote_imap_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _search(mail: imaplib.IMAP4, charset: str | None, *criteria: str) -> list[bytes]:
+    if charset:
+        criteria = ("CHARSET", charset, *criteria)
+    status, search_data = mail.uid("SEARCH", *criteria)
+    if status != "OK":
+        raise RuntimeError("Impossible de parcourir la boîte mail.")
+    return search_data[0].split()
+
+
+def _subject_criteria(tokens: list[str]) -> list[str]:
+    # OR takes exactly two keys, so the alternatives are nested to the right.
+    criteria: list[str] = []
+    for token in tokens[:-1]:
+        criteria += ["OR", "SUBJECT", _quote_imap_string(token)]
+    criteria += ["SUBJECT", _quote_imap_string(tokens[-1])]
+    return criteria
+
+
+def search_message_uids(
+    mail: imaplib.IMAP4, start_time: datetime, end_time: datetime, subject_tokens: list[str]
+) -> list[bytes]:
+    if not subject_tokens:
+        # No client has an expected subject, so no message could ever match.
+        return []
+
+    # IMAP dates have day granularity: SINCE/BEFORE bound the window server-side
+    # and the exact hours are checked locally against INTERNALDATE.
+    window = (
+        "SINCE",
+        start_time.strftime("%d-%b-%Y"),
+        "BEFORE",
+        (end_time + timedelta(days=1)).strftime("%d-%b-%Y"),
+    )
+    # The server narrows candidates with a substring SUBJECT search; the prefix
+    # match itself still happens locally once the headers are fetched.
+    uids: set[bytes] = set()
+    ascii_tokens = [token for token in subject_tokens if token.isascii()]
+    for index in range(0, len(ascii_tokens), SEARCH_TOKENS_PER_COMMAND):
+        group = ascii_tokens[index:index + SEARCH_TOKENS_PER_COMMAND]
+        uids.update(_search(mail, None, *window, *_subject_criteria(group)))
+    for token in subject_tokens:
+        if not token.isascii():
+            # imaplib only sends ASCII arguments, so the token goes as a UTF-8 literal.
+            mail.literal = token.encode("utf-8")
+            try:
+                uids.update(_search(mail, "UTF-8", *window, "SUBJECT"))
+            except (RuntimeError, imaplib.IMAP4.error):
+                # Servers without UTF-8 SEARCH get the whole window instead;
+                # subjects are matched locally anyway.
+                mail.literal = None
+                uids.update(_search(mail, None, *window))
+                break
+    return sorted(uids, key=int)
+
+
+def _iter_header_chunk(
+    mail: imaplib.IMAP4, chunk: list[bytes], tz: ZoneInfo
+) -> Iterator[tuple[bytes | None, tuple[str, str, datetime | None]]]:
+    status, data = mail.uid("FETCH", b",".join(chunk), HEADER_FETCH_SPEC)
+    if status != "OK":
+        raise RuntimeError("Impossible de récupérer les messages.")
+
+    data = data or []
+    for index, item in enumerate(data):
+        # imaplib interleaves (envelope, literal) tuples with b")" closers.
+        if not isinstance(item, tuple):
+            continue
+        received_at = parse_internal_date(item[0], tz)
+        uid_match = _UID_RE.search(item[0])
+        closer = data[index + 1] if index + 1 < len(data) else None
+        if isinstance(closer, bytes):
+            # Some servers send INTERNALDATE or UID after the header literal.
+            if received_at is None:
+                received_at = parse_internal_date(closer, tz)
+            uid_match = uid_match or _UID_RE.search(closer)
+        fields = parse_header_fields(item[1])
+        subject = decode_subject(fields.get("subject", ""))
+        uid = uid_match.group(1) if uid_match else None
+        yield uid, (subject.lower().strip(), subject, received_at)
+
+
+def _fetch_header_chunks(
+    mail: imaplib.IMAP4, chunks: list[list[bytes]], tz: ZoneInfo
+) -> list[tuple[bytes | None, tuple[str, str, datetime | None]]]:
+    return [entry for chunk in chunks for entry in _iter_header_chunk(mail, chunk, tz)]
+
+
+def _fetch_header_chunks_on_own_connection(
+    config: EmailConfig, chunks: list[list[bytes]], tz: ZoneInfo
+) -> list[tuple[bytes | None, tuple[str, str, datetime | None]]]:
+    with get_connection(config) as mail:
+        return _fetch_header_chunks(mail, chunks, tz)
+
+
+def _fetch_headers(
+    config: EmailConfig, mail: imaplib.IMAP4, uids: list[bytes], tz: ZoneInfo
+) -> Iterator[tuple[bytes | None, tuple[str, str, datetime | None]]]:
+    batch_size = get_fetch_batch_size()
+    # Large UID sets are split so a single FETCH stays under server request limits.
+    chunks = [uids[index:index + batch_size] for index in range(0, len(uids), batch_size)]
+    workers = min(len(chunks), get_imap_workers())
+    if workers <= 1:
+        # Only one FETCH response is held in memory at a time.
+        for chunk in chunks:
+            yield from _iter_header_chunk(mail, chunk, tz)
+        return
+
+    # Contiguous groups keep the mailbox order when results are yielded in turn.
+    group_size = -(-len(chunks) // workers)
+    groups = [chunks[index:index + group_size] for index in range(0, len(chunks), group_size)]
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [executor.submit(_fetch_header_chunks, mail, groups[0], tz)]
+        futures.extend(
+            executor.submit(_fetch_header_chunks_on_own_connection, config, group, tz)
+            for group in groups[1:]
+        )
+        for future in futures:
+            yield from future.result()
+
+
+def _mailbox_uidvalidity(mail: imaplib.IMAP4) -> bytes | None:
+    # Kept by imaplib from the SELECT response until the next SELECT.
+    values = getattr(mail, "untagged_responses", {}).get("UIDVALIDITY")
+    return values[-1] if values else None
+
+
+def iter_message_headers(
+    config: EmailConfig, mail: imaplib.IMAP4, uids: list[bytes], tz: ZoneInfo
+) -> Iterator[tuple[str, str, datetime | None]]:
+    # UIDs are stable while UIDVALIDITY is unchanged, so headers fetched by an
+    # earlier run are reused and only messages new to the window are fetched.
+    key = connection_key(config)
+    uidvalidity = _mailbox_uidvalidity(mail)
+    cached_validity, cached = _header_cache.get(key, (None, {}))
+    if uidvalidity is None or cached_validity != uidvalidity:
+        cached = {}
+
+    headers = {uid: cached[uid] for uid in uids if uid in cached}
+    missing = [uid for uid in uids if uid not in headers]
+    for uid, entry in _fetch_headers(config, mail, missing, tz):
+        if uid is not None:
+            headers[uid] = entry
+    if uidvalidity is not None:
+        _header_cache[key] = (uidvalidity, headers)
+
+    for uid in uids:
+        entry = headers.get(uid)
+        if entry is not None:
+            yield entry
+
+
+def _summarize_matches(
+    matched_subject: str | None, note: str | None, status_counts: dict[str, int]
 ) -> tuple[str | None, str | None, str | None, str | None, int]:
-    matched_subject = None
     matched_status = None
     matched_statuses_summary = None
     email_count = 0
-    note = None
-    status_counts: dict[str, int] = {}
-    for msg_id in reversed(message_ids):
-        status, msg_data = mail.fetch(msg_id, "(RFC822)")
-        if status != "OK" or not msg_data:
-            note = "Impossible de récupérer le message." if not note else note
-            continue
-        raw_email = msg_data[0][1]
-        message = email.message_from_bytes(raw_email)
-        received_at = parse_email_date(message.get("Date"), tz)
-        if not received_at:
-            note = note or "Date du message introuvable."
-            continue
-        if received_at and (received_at < start_time or received_at > end_time):
-            continue
-        subject = decode_subject(message.get("Subject", ""))
-        matched_status = extract_status_from_subject(subject, client)
-        if matched_status:
-            if matched_subject is None:
-                matched_subject = subject
-            status_counts[matched_status] = status_counts.get(matched_status, 0) + 1
-
     if status_counts:
         email_count = sum(status_counts.values())
-        status_order = [STATUS_FAILED, STATUS_WARNING, STATUS_OK]
         matched_status = next(
-            (status for status in status_order if status_counts.get(status)), None
+            (status for status in STATUS_PRIORITY if status_counts.get(status)), None
         )
         parts = [
             f"{status} ×{status_counts[status]}" if status_counts[status] > 1 else status
-            for status in status_order
+            for status in STATUS_PRIORITY
             if status_counts.get(status)
         ]
         matched_statuses_summary = ", ".join(parts)
@@ -137,12 +381,40 @@ def find_matching_subject(
     return matched_subject, note, matched_status, matched_statuses_summary, email_count
 
 
+def match_clients(
+    headers: Iterable[tuple[str, str, datetime | None]],
+    matcher: dict,
+    client_ids: list[int],
+    start_time: datetime,
+    end_time: datetime,
+) -> dict[int, tuple[str | None, str | None, str | None, str | None, int]]:
+    note = None
+    matched_subjects: dict[int, str] = {}
+    status_counts: dict[int, dict[str, int]] = {client_id: {} for client_id in client_ids}
+    # Headers arrive oldest first, so the last match seen is the most recent one.
+    for subject_lower, subject, received_at in headers:
+        if not received_at:
+            note = note or "Date du message introuvable."
+            continue
+        if received_at < start_time or received_at > end_time:
+            continue
+        for client_id, status in extract_statuses_from_subject(subject_lower, matcher).items():
+            matched_subjects[client_id] = subject
+            counts = status_counts[client_id]
+            counts[status] = counts.get(status, 0) + 1
+
+    return {
+        client_id: _summarize_matches(matched_subjects.get(client_id), note, counts)
+        for client_id, counts in status_counts.items()
+    }
+
+
 def run_email_checks(app=None):
     app = app or current_app._get_current_object()
     with app.app_context():
-        clients = Client.query.all()
+        clients = Client.query.options(load_only(*CHECK_COLUMNS)).all()
         config = EmailConfig.get_singleton()
-        tz = ZoneInfo(os.getenv("TZ", "Europe/Paris"))
+        tz = get_timezone()
         now = datetime.now(tz=tz)
         start_hour, end_hour = get_window_hours(config)
         start_time = (now - timedelta(days=1)).replace(
@@ -152,29 +424,45 @@ def run_email_checks(app=None):
         end_time = end_time_target if end_time_target < now else now
 
         if not config.imap_host or not config.imap_username or not config.imap_password:
-            for client in clients:
-                client.last_status = STATUS_MISSING
-                client.last_checked_at = now
-                client.last_note = "Configuration IMAP incomplète."
-                client.last_email_count = 0
-                client.last_statuses = None
-            db.session.commit()
+            db.session.bulk_update_mappings(
+                Client,
+                [
+                    {
+                        "id": client.id,
+                        "last_status": STATUS_MISSING,
+                        "last_checked_at": now,
+                        "last_note": "Configuration IMAP incomplète.",
+                        "last_email_count": 0,
+                        "last_statuses": None,
+                    }
+                    for client in clients
+                ],
+            )
             add_log("Vérification impossible : configuration IMAP incomplète.", level="warning")
+            db.session.commit()
             return
 
         try:
-            if config.use_ssl:
-                mail = imaplib.IMAP4_SSL(config.imap_host, config.imap_port)
-            else:
-                mail = imaplib.IMAP4(config.imap_host, config.imap_port)
-            mail.login(config.imap_username, config.imap_password)
-            mail.select("INBOX")
-            date_filter = start_time.strftime("%d-%b-%Y")
-            status, search_data = mail.search(None, f'(SINCE "{date_filter}")')
-            if status != "OK":
-                raise RuntimeError("Impossible de parcourir la boîte mail.")
-            message_ids = search_data[0].split()
-
+            with get_connection(config) as mail:
+                uids = search_message_uids(
+                    mail, start_time, end_time, collect_subject_tokens(clients)
+                )
+                matcher = build_subject_matcher(
+                    {client.id: build_subject_patterns(client) for client in clients}
+                )
+                results = match_clients(
+                    iter_message_headers(config, mail, uids, tz),
+                    matcher,
+                    [client.id for client in clients],
+                    start_time,
+                    end_time,
+                )
+
+            missing_note = (
+                f"Aucun message reçu entre {format_short_datetime(start_time)} et "
+                f"{format_short_datetime(end_time)} ({tz}) ne correspond au début d'objet attendu."
+            )
+            updates = []
             for client in clients:
                 (
                     matched_subject,
@@ -182,119 +470,142 @@ def run_email_checks(app=None):
                     matched_status,
                     matched_statuses,
                     email_count,
-                ) = find_matching_subject(message_ids, client, mail, start_time, end_time, tz)
-                client.last_email_count = email_count
-                client.last_statuses = matched_statuses
+                ) = results[client.id]
                 if matched_subject:
-                    client.last_status = matched_status or STATUS_OK
-                    client.last_subject = matched_subject
-                    client.last_note = None
-                    if not matched_statuses:
-                        client.last_statuses = matched_status
-                        client.last_email_count = 1
+                    update = {
+                        "last_status": matched_status or STATUS_OK,
+                        "last_subject": matched_subject,
+                        "last_note": None,
+                        "last_statuses": matched_statuses or matched_status,
+                        "last_email_count": email_count if matched_statuses else 1,
+                    }
                 else:
-                    client.last_status = STATUS_MISSING
-                    client.last_subject = None
-                    client.last_statuses = None
-                    client.last_email_count = 0
-                    client.last_note = (
-                        note
-                        or f"Aucun message reçu entre {start_time.strftime('%d/%m %H:%M')} et {end_time.strftime('%d/%m %H:%M')} ({tz}) ne correspond au début d'objet attendu."
-                    )
-                client.last_checked_at = now
-
-            mail.logout()
-            db.session.commit()
+                    update = {
+                        "last_status": STATUS_MISSING,
+                        "last_subject": None,
+                        "last_statuses": None,
+                        "last_email_count": 0,
+                        "last_note": note or missing_note,
+                    }
+                updates.append({"id": client.id, "last_checked_at": now, **update})
+
+            db.session.bulk_update_mappings(Client, updates)
             add_log(f"Vérification des emails effectuée pour {len(clients)} clients.")
-        except Exception as exc:  # noqa: BLE001
-            for client in clients:
-                client.last_status = STATUS_MISSING
-                client.last_checked_at = now
-                client.last_note = f"Erreur IMAP: {exc}"
             db.session.commit()
+        except Exception as exc:  # noqa: BLE001
+            client_ids = [client.id for client in clients]
+            # The failure may come from the bulk update itself.
+            db.session.rollback()
+            db.session.bulk_update_mappings(
+                Client,
+                [
+                    {
+                        "id": client_id,
+                        "last_status": STATUS_MISSING,
+                        "last_checked_at": now,
+                        "last_note": f"Erreur IMAP: {exc}",
+                    }
+                    for client_id in client_ids
+                ],
+            )
             add_log(f"Erreur lors de la vérification des emails: {exc}", level="error")
+            db.session.commit()
 
 
-def build_status_report(clients: list[Client], tz: ZoneInfo, window_label: str) -> str:
-    header = ["Rapport de statut Veeam", "======================", ""]
-    lines = header
-    now = datetime.now(tz=tz)
-    lines.append(f"Généré le {now.strftime('%d/%m/%Y %H:%M')} ({tz})")
-    lines.append("")
+def _cached_report_section(kind: str, clients: list[Client], window_label: str, render) -> str:
+    # The key holds every rendered column: last_checked_at alone can repeat
+    # across runs where the database keeps whole seconds.
+    key = (
+        kind,
+        window_label,
+        tuple(
+            (
+                client.id,
+                client.name,
+                client.last_checked_at,
+                client.last_status,
+                client.last_subject,
+                client.last_note,
+                client.last_statuses,
+                client.last_email_count,
+            )
+            for client in clients
+        ),
+    )
+    section = _report_cache.get(key)
+    if section is None:
+        section = render(clients, window_label)
+        # Scheduled and manual reports can render concurrently.
+        with _report_cache_lock:
+            if len(_report_cache) >= REPORT_CACHE_SIZE:
+                _report_cache.pop(next(iter(_report_cache)), None)
+            _report_cache[key] = section
+    return section
+
+
+def build_status_report(
+    clients: list[Client], tz: ZoneInfo, window_label: str, now: datetime
+) -> str:
+    header = (
+        "Rapport de statut Veeam\n"
+        "======================\n"
+        "\n"
+        f"Généré le {format_datetime(now)} ({tz})\n"
+    )
+    return header + _cached_report_section("text", clients, window_label, _render_report_lines)
+
+
+def _render_report_lines(clients: list[Client], window_label: str) -> str:
+    return "\n".join(_iter_report_lines(clients, window_label))
+
+
+def _iter_report_lines(clients: list[Client], window_label: str) -> Iterator[str]:
+    statuses_prefix = f"  Statuts reçus ({window_label}) : "
+    yield ""
     for client in clients:
         checked_at = (
-            client.last_checked_at.strftime("%d/%m/%Y %H:%M")
+            format_datetime(client.last_checked_at)
             if client.last_checked_at
             else "Jamais vérifié"
         )
-        lines.append(f"- {client.name}: {client.status_label()}")
-        lines.append(f"  Dernier sujet : {client.last_subject or '—'}")
-        lines.append(
-            f"  Statuts reçus ({window_label}) : "
-            f"{client.last_statuses or '—'} ({client.last_email_count or 0} mail(s))"
-        )
-        lines.append(f"  Dernière vérification : {checked_at}")
+        yield f"- {client.name}: {client.status_label()}"
+        yield f"  Dernier sujet : {client.last_subject or '—'}"
+        yield f"{statuses_prefix}{client.last_statuses or '—'} ({client.last_email_count or 0} mail(s))"
+        yield f"  Dernière vérification : {checked_at}"
         if client.last_note:
-            lines.append(f"  Note : {client.last_note}")
-        lines.append("")
+            yield f"  Note : {client.last_note}"
+        yield ""
+
 
-    return "\n".join(lines)
+_STATUS_BADGES = {
+    STATUS_OK: ("#16a34a", "#e7f7ec"),
+    STATUS_WARNING: ("#f59e0b", "#fff7e6"),
+    STATUS_FAILED: ("#dc2626", "#fdecec"),
+    STATUS_MISSING: ("#6b7280", "#f3f4f6"),
+}
 
 
 def _status_badge(status: str) -> tuple[str, str]:
-    palette = {
-        STATUS_OK: ("#16a34a", "#e7f7ec"),
-        STATUS_WARNING: ("#f59e0b", "#fff7e6"),
-        STATUS_FAILED: ("#dc2626", "#fdecec"),
-        STATUS_MISSING: ("#6b7280", "#f3f4f6"),
-    }
-    return palette.get(status, ("#0ea5e9", "#e0f2fe"))
+    return _STATUS_BADGES.get(status, ("#0ea5e9", "#e0f2fe"))
 
 
-def build_status_report_html(
-    clients: list[Client], tz: ZoneInfo, window_label: str
-) -> str:
-    now = datetime.now(tz=tz)
-    header_date = now.strftime("%d/%m/%Y %H:%M")
-    rows: list[str] = []
-    for client in clients:
-        fg, bg = _status_badge(client.status_label())
-        checked_at = (
-            client.last_checked_at.strftime("%d/%m/%Y %H:%M")
-            if client.last_checked_at
-            else "Jamais vérifié"
-        )
-        subject = client.last_subject or "—"
-        note = client.last_note or "—"
-        statuses = client.last_statuses or "—"
-        email_count = client.last_email_count or 0
-        rows.append(
-            """
+_REPORT_ROW_TEMPLATE = string.Template(
+    """
             <tr>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;font-weight:600;color:#111827;">{name}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;font-weight:600;color:#111827;">${name}</td>
                 <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;">
-                    <span style="display:inline-block;padding:6px 10px;border-radius:999px;font-weight:700;color:{fg};background:{bg};border:1px solid {fg}1a;">{status}</span>
+                    <span style="display:inline-block;padding:6px 10px;border-radius:999px;font-weight:700;color:${fg};background:${bg};border:1px solid ${fg}1a;">${status}</span>
                 </td>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#374151;">{statuses}</td>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#111827;font-weight:600;">{email_count}</td>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;font-family:'SFMono-Regular',Consolas,monospace;color:#374151;font-size:13px;">{subject}</td>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#374151;">{checked_at}</td>
-                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#4b5563;">{note}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#374151;">${statuses}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#111827;font-weight:600;">${email_count}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;font-family:'SFMono-Regular',Consolas,monospace;color:#374151;font-size:13px;">${subject}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#374151;">${checked_at}</td>
+                <td style="padding:12px 14px;border-bottom:1px solid #e5e7eb;color:#4b5563;">${note}</td>
             </tr>
-            """.format(
-                name=html.escape(client.name),
-                status=html.escape(client.status_label()),
-                subject=html.escape(subject),
-                checked_at=html.escape(checked_at),
-                note=html.escape(note),
-                statuses=html.escape(statuses),
-                email_count=email_count,
-                fg=fg,
-                bg=bg,
-            )
-        )
+            """
+)
 
-    table_body = "".join(rows) or """
+_REPORT_EMPTY_ROW = """
         <tr>
             <td colspan="7" style="padding:16px;text-align:center;color:#6b7280;background:#f9fafb;">
                 Aucun client n'a été configuré pour le moment.
@@ -302,110 +613,150 @@ def build_status_report_html(
         </tr>
     """
 
-    return f"""
+_REPORT_DOCUMENT_TEMPLATE = string.Template(
+    """
     <!doctype html>
-    <html lang=\"fr\">
-    <body style=\"margin:0;padding:0;background:#f3f4f6;font-family:'Segoe UI',Helvetica,Arial,sans-serif;\">
-        <div style=\"max-width:760px;margin:24px auto;background:#ffffff;border:1px solid #e5e7eb;border-radius:14px;overflow:hidden;box-shadow:0 6px 24px rgba(15,23,42,0.08);\"> 
-            <div style=\"background:linear-gradient(120deg,#e5e7eb,#f8fafc);color:#0f172a;padding:18px 22px;\">
-                <div style=\"font-size:14px;opacity:0.9;letter-spacing:0.3px;\">Rapport Veeam</div>
-                <div style=\"font-size:22px;font-weight:700;margin-top:4px;\">Statut des notifications</div>
-                <div style=\"font-size:13px;opacity:0.85;margin-top:6px;\">Généré le {header_date} ({tz})</div>
+    <html lang="fr">
+    <body style="margin:0;padding:0;background:#f3f4f6;font-family:'Segoe UI',Helvetica,Arial,sans-serif;">
+        <div style="max-width:760px;margin:24px auto;background:#ffffff;border:1px solid #e5e7eb;border-radius:14px;overflow:hidden;box-shadow:0 6px 24px rgba(15,23,42,0.08);"> 
+            <div style="background:linear-gradient(120deg,#e5e7eb,#f8fafc);color:#0f172a;padding:18px 22px;">
+                <div style="font-size:14px;opacity:0.9;letter-spacing:0.3px;">Rapport Veeam</div>
+                <div style="font-size:22px;font-weight:700;margin-top:4px;">Statut des notifications</div>
+                <div style="font-size:13px;opacity:0.85;margin-top:6px;">Généré le ${header_date} (${tz})</div>
             </div>
-            <div style=\"padding:20px 22px 10px;\">
-                <p style=\"margin:0 0 12px;color:#1f2937;font-size:14px;line-height:1.6;\">
+            <div style="padding:20px 22px 10px;">
+                <p style="margin:0 0 12px;color:#1f2937;font-size:14px;line-height:1.6;">
                     Voici un récapitulatif des derniers statuts reçus pour vos clients.
                 </p>
             </div>
-            <div style=\"padding:0 22px 22px;\">
-                <table style=\"width:100%;border-collapse:collapse;border:1px solid #e5e7eb;border-radius:10px;overflow:hidden;\">
+            <div style="padding:0 22px 22px;">
+                <table style="width:100%;border-collapse:collapse;border:1px solid #e5e7eb;border-radius:10px;overflow:hidden;">
                     <thead>
-                        <tr style=\"background:#f9fafb;border-bottom:1px solid #e5e7eb;\">
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Client</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Statut</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Statuts ({window_label})</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Mails reçus</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Dernier sujet</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Vérifié le</th>
-                            <th style=\"padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;\">Notes</th>
+                        <tr style="background:#f9fafb;border-bottom:1px solid #e5e7eb;">
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Client</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Statut</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Statuts (${window_label})</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Mails reçus</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Dernier sujet</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Vérifié le</th>
+                            <th style="padding:12px 14px;text-align:left;font-size:13px;color:#6b7280;text-transform:uppercase;letter-spacing:0.05em;">Notes</th>
                         </tr>
                     </thead>
                     <tbody>
-                        {table_body}
+                        ${table_body}
                     </tbody>
                 </table>
             </div>
-            <div style=\"padding:14px 22px 20px;color:#6b7280;font-size:12px;border-top:1px solid #f3f4f6;background:#fbfbff;\">
+            <div style="padding:14px 22px 20px;color:#6b7280;font-size:12px;border-top:1px solid #f3f4f6;background:#fbfbff;">
                 Ce message est généré automatiquement par Veeam Notify. Merci de ne pas y répondre directement.
             </div>
         </div>
     </body>
     </html>
     """
+)
+
+
+def build_status_report_html(
+    clients: list[Client], tz: ZoneInfo, window_label: str, now: datetime
+) -> str:
+    return _REPORT_DOCUMENT_TEMPLATE.substitute(
+        header_date=format_datetime(now),
+        tz=tz,
+        window_label=window_label,
+        table_body=_cached_report_section("html", clients, window_label, _render_report_rows)
+        or _REPORT_EMPTY_ROW,
+    )
+
+
+def _render_report_rows(clients: list[Client], window_label: str) -> str:
+    rows = io.StringIO()
+    # Only a handful of distinct labels exist, so each is escaped and colored once.
+    badges: dict[str, tuple[str, str, str]] = {}
+    for client in clients:
+        label = client.status_label()
+        badge = badges.get(label)
+        if badge is None:
+            badge = badges[label] = (label.translate(_HTML_ESCAPE), *_status_badge(label))
+        status, fg, bg = badge
+        checked_at = (
+            format_datetime(client.last_checked_at)
+            if client.last_checked_at
+            else "Jamais vérifié"
+        )
+        subject = client.last_subject or "—"
+        note = client.last_note or "—"
+        statuses = client.last_statuses or "—"
+        email_count = client.last_email_count or 0
+        rows.write(
+            _REPORT_ROW_TEMPLATE.substitute(
+                name=client.name.translate(_HTML_ESCAPE),
+                status=status,
+                subject=subject.translate(_HTML_ESCAPE),
+                checked_at=checked_at,
+                note=note.translate(_HTML_ESCAPE),
+                statuses=statuses.translate(_HTML_ESCAPE),
+                email_count=email_count,
+                fg=fg,
+                bg=bg,
+            )
+        )
+    return rows.getvalue()
 
 
 def parse_report_recipients(raw_recipients: str) -> list[str]:
-    return [
-        part.strip()
-        for part in re.split(r"[,;\n]+", raw_recipients)
-        if part.strip()
-    ]
+    parts = raw_recipients.translate(_RECIPIENT_SEPARATORS).split(",")
+    return [part for part in map(str.strip, parts) if part]
 
 
 def send_status_report(app=None) -> tuple[bool, str]:
     app = app or current_app._get_current_object()
     with app.app_context():
-        config = EmailConfig.get_singleton()
-        tz = ZoneInfo(os.getenv("TZ", "Europe/Paris"))
-        recipients = parse_report_recipients(config.report_recipients or "")
+        try:
+            return _send_status_report()
+        finally:
+            flush_logs()
+
+
+def _send_status_report() -> tuple[bool, str]:
+    config = EmailConfig.get_singleton()
+    tz = get_timezone()
+    recipients = parse_report_recipients(config.report_recipients or "")
+
+    if not recipients:
+        message = "Aucun destinataire configuré pour le rapport."
+        add_log(message, level="warning")
+        return False, message
+
+    missing_smtp = not (
+        config.smtp_host and config.smtp_port and config.smtp_username and config.smtp_password
+    )
+    if missing_smtp:
+        message = "Configuration SMTP incomplète pour l'envoi du rapport."
+        add_log(message, level="error")
+        return False, message
+
+    clients = (
+        Client.query.options(load_only(*REPORT_COLUMNS)).order_by(Client.name).all()
+    )
+    window_label = format_window_label(config)
+    now = datetime.now(tz=tz)
+    body = build_status_report(clients, tz, window_label, now)
+    html_body = build_status_report_html(clients, tz, window_label, now)
 
-        if not recipients:
-            message = "Aucun destinataire configuré pour le rapport."
-            add_log(message, level="warning")
-            return False, message
+    msg = EmailMessage()
+    msg["Subject"] = f"Rapport Veeam - {format_datetime(now)}"
+    msg["From"] = config.smtp_username
+    msg["To"] = ", ".join(recipients)
+    msg.set_content(body)
+    msg.add_alternative(html_body, subtype="html")
 
-        missing_smtp = not (
-            config.smtp_host and config.smtp_port and config.smtp_username and config.smtp_password
-        )
-        if missing_smtp:
-            message = "Configuration SMTP incomplète pour l'envoi du rapport."
-            add_log(message, level="error")
-            return False, message
-
-        clients = Client.query.order_by(Client.name).all()
-        window_label = format_window_label(config)
-        body = build_status_report(clients, tz, window_label)
-        html_body = build_status_report_html(clients, tz, window_label)
-
-        msg = EmailMessage()
-        msg["Subject"] = f"Rapport Veeam - {datetime.now(tz=tz).strftime('%d/%m/%Y %H:%M')}"
-        msg["From"] = config.smtp_username
-        msg["To"] = ", ".join(recipients)
-        msg.set_content(body)
-        msg.add_alternative(html_body, subtype="html")
-
-        server = None
-        try:
-            use_ssl_direct = config.use_ssl and config.smtp_port == 465
-            if use_ssl_direct:
-                server = smtplib.SMTP_SSL(config.smtp_host, config.smtp_port, timeout=10)
-            else:
-                server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=10)
-                if config.use_ssl:
-                    server.ehlo()
-                    server.starttls()
-                    server.ehlo()
-            server.login(config.smtp_username, config.smtp_password)
+    try:
+        with get_smtp(config) as server:
             server.send_message(msg)
-            add_log(f"Rapport envoyé à {len(recipients)} destinataire(s).")
-            return True, "Rapport envoyé avec succès."
-        except Exception as exc:  # noqa: BLE001
-            message = f"Échec de l'envoi du rapport : {exc}"
-            add_log(message, level="error")
-            return False, message
-        finally:
-            if server:
-                try:
-                    server.quit()
-                except Exception:  # noqa: BLE001
-                    pass
+        add_log(f"Rapport envoyé à {len(recipients)} destinataire(s).")
+        return True, "Rapport envoyé avec succès."
+    except Exception as exc:  # noqa: BLE001
+        message = f"Échec de l'envoi du rapport : {exc}"
+        add_log(message, level="error")
+        return False, message
@@ -0,0 +1,81 @@
+import imaplib
+from contextlib import contextmanager
+from typing import Iterator
+
+from .models import EmailConfig
+from .session_pool import SSL_CONTEXT, SessionPool
+
+IMAP_IDLE_TIMEOUT = 20 * 60
+# A parked session can go half-open without notice; a socket timeout keeps the
+# NOOP probe from hanging instead of failing over to a fresh login.
+IMAP_TIMEOUT = 30
+
+
+def open_mailbox(config: EmailConfig) -> imaplib.IMAP4:
+    if config.use_ssl:
+        mail = imaplib.IMAP4_SSL(
+            config.imap_host,
+            config.imap_port,
+            ssl_context=SSL_CONTEXT,
+            timeout=IMAP_TIMEOUT,
+        )
+    else:
+        mail = imaplib.IMAP4(config.imap_host, config.imap_port, timeout=IMAP_TIMEOUT)
+    mail.login(config.imap_username, config.imap_password)
+    # EXAMINE: checks only read, so \Recent and other session flags stay untouched.
+    mail.select("INBOX", readonly=True)
+    return mail
+
+
+def close_mailbox(mail: imaplib.IMAP4) -> None:
+    try:
+        mail.logout()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def drop_mailbox(mail: imaplib.IMAP4) -> None:
+    try:
+        mail.shutdown()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def connection_key(config: EmailConfig) -> tuple:
+    return (
+        config.imap_host,
+        config.imap_port,
+        config.imap_username,
+        config.imap_password,
+        config.use_ssl,
+    )
+
+
+def _is_alive(mail: imaplib.IMAP4) -> bool:
+    try:
+        status, _ = mail.noop()
+    except (imaplib.IMAP4.error, OSError):
+        return False
+    return status == "OK"
+
+
+_pool = SessionPool(
+    open_mailbox, close_mailbox, drop_mailbox, _is_alive, connection_key, IMAP_IDLE_TIMEOUT
+)
+
+
+@contextmanager
+def get_connection(config: EmailConfig) -> Iterator[imaplib.IMAP4]:
+    # A session is checked out for the duration of the block, so concurrent
+    # users never share a socket, and parked again only if the block succeeds.
+    mail = _pool.checkout(config)
+    try:
+        yield mail
+    except Exception:
+        close_mailbox(mail)
+        raise
+    _pool.checkin(config, mail)
+
+
+def close_all() -> None:
+    _pool.close_all()
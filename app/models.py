@@ -1,7 +1,9 @@
 import os
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
+from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from . import db
@@ -12,17 +14,27 @@ STATUS_MISSING = "Non reçu"
 STATUS_FAILED = "Failed"
 STATUS_WARNING = "Warning"
 STATUS_CHOICES = [STATUS_OK, STATUS_MISSING, STATUS_FAILED, STATUS_WARNING]
+STATUS_BADGE_CLASSES = {
+    status: "status-" + status.lower().replace(" ", "-") for status in STATUS_CHOICES
+}
+
+
+@lru_cache(maxsize=4)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def get_timezone() -> ZoneInfo:
+    return _zone(os.getenv("TZ", "Europe/Paris"))
 
 
 def current_time() -> datetime:
-    tz = ZoneInfo(os.getenv("TZ", "Europe/Paris"))
-    return datetime.now(tz=tz)
+    return datetime.now(tz=get_timezone())
 
 
 class Client(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(128), nullable=False)
-    expected_subject = db.Column(db.String(512), nullable=False)
+    name = db.Column(db.String(128), nullable=False, index=True)
     expected_subject_ok = db.Column(db.String(512))
     expected_subject_warning = db.Column(db.String(512))
     expected_subject_failed = db.Column(db.String(512))
@@ -36,9 +48,14 @@ class Client(db.Model):
     def status_label(self) -> str:
         return self.last_status or STATUS_MISSING
 
+    @hybrid_property
+    def expected_subject(self):
+        # Former single-subject column, now an alias of the OK subject.
+        return self.expected_subject_ok
+
     @property
     def subject_ok(self) -> str:
-        return (self.expected_subject_ok or self.expected_subject or "").strip()
+        return (self.expected_subject_ok or "").strip()
 
     @property
     def subject_warning(self) -> str:
@@ -70,6 +87,16 @@ class EmailConfig(db.Model):
     check_window_end_hour = db.Column(db.Integer, default=9, nullable=False)
     updated_at = db.Column(db.DateTime, default=current_time, onupdate=current_time)
 
+    def schedule_settings(self) -> dict:
+        # Plain values outlive the commit that expires this instance.
+        return {
+            "check_schedule_hour": self.check_schedule_hour,
+            "check_schedule_minute": self.check_schedule_minute,
+            "report_schedule_hour": self.report_schedule_hour,
+            "report_schedule_minute": self.report_schedule_minute,
+            "auto_report_enabled": self.auto_report_enabled,
+        }
+
     @classmethod
     def get_singleton(cls):
         instance = cls.query.first()
@@ -89,6 +116,10 @@ class EmailConfig(db.Model):
         return instance
 
 
+# Hashed at import so that no login request ever pays for building it.
+_DUMMY_PASSWORD_HASH = generate_password_hash(os.urandom(16).hex())
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
@@ -101,6 +132,16 @@ class User(db.Model):
     def check_password(self, raw_password: str) -> bool:
         return check_password_hash(self.password_hash, raw_password)
 
+    @classmethod
+    def authenticate(cls, username: str, raw_password: str):
+        user = cls.query.filter_by(username=username).first()
+        if user is None:
+            # Same hashing work as a real account, so response time does not
+            # reveal which usernames exist.
+            check_password_hash(_DUMMY_PASSWORD_HASH, raw_password)
+            return None
+        return user if user.check_password(raw_password) else None
+
     @classmethod
     def ensure_default_admin(cls):
         if not cls.query.filter_by(username="admin").first():
@@ -112,12 +153,26 @@ class User(db.Model):
 
 class LogEntry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    created_at = db.Column(db.DateTime, default=current_time, nullable=False)
+    created_at = db.Column(db.DateTime, default=current_time, nullable=False, index=True)
     level = db.Column(db.String(16), default="INFO", nullable=False)
     message = db.Column(db.Text, nullable=False)
 
 
 def add_log(message: str, level: str = "INFO") -> None:
+    # The entry joins the caller's transaction; flush_logs commits it when the
+    # caller has nothing else to commit.
     entry = LogEntry(message=message, level=level.upper())
     db.session.add(entry)
+
+
+def flush_logs() -> None:
+    if any(isinstance(obj, LogEntry) for obj in db.session.new):
+        db.session.commit()
+
+
+def purge_logs(before: datetime) -> int:
+    deleted = LogEntry.query.filter(LogEntry.created_at < before).delete(
+        synchronize_session=False
+    )
     db.session.commit()
+    return deleted
@@ -1,11 +1,12 @@
 import csv
-import imaplib
 import io
-import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import wraps
 
 from flask import (
     Blueprint,
+    abort,
     current_app,
     flash,
     g,
@@ -14,20 +15,33 @@ from flask import (
     render_template,
     request,
     session,
+    stream_with_context,
     url_for,
 )
+from sqlalchemy import delete, select, update
 
 from . import db
 from .email_service import (
     DEFAULT_WINDOW_END_HOUR,
     DEFAULT_WINDOW_START_HOUR,
+    REPORT_COLUMNS,
     format_window_label,
     parse_report_recipients,
     run_email_checks,
     send_status_report,
 )
-from .models import Client, EmailConfig, LogEntry, STATUS_CHOICES, STATUS_MISSING, User, add_log
-from .scheduler import configure_jobs
+from .imap_pool import get_connection
+from .models import (
+    Client,
+    EmailConfig,
+    LogEntry,
+    STATUS_BADGE_CLASSES,
+    STATUS_MISSING,
+    User,
+    add_log,
+    flush_logs,
+)
+from .smtp_pool import get_smtp
 
 
 bp = Blueprint("main", __name__)
@@ -36,6 +50,12 @@ DEFAULT_CHECK_SCHEDULE_HOUR = 9
 DEFAULT_CHECK_SCHEDULE_MINUTE = 0
 DEFAULT_REPORT_SCHEDULE_HOUR = 9
 DEFAULT_REPORT_SCHEDULE_MINUTE = 30
+IMPORT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+LOGS_PAGE_SIZE = 200
+CONNECTION_TEST_TIMEOUT = 10
+
+_connection_tests = ThreadPoolExecutor(max_workers=4, thread_name_prefix="connection-test")
 
 
 def login_required(view):
@@ -48,6 +68,40 @@ def login_required(view):
     return wrapped_view
 
 
+def _run_in_background(job, job_id: str) -> None:
+    # IMAP and SMTP round-trips take seconds; the job logs its own outcome.
+    app = current_app._get_current_object()
+    if app.config["RUN_SCHEDULER"]:
+        from .scheduler import run_job_now
+
+        run_job_now(app, job, job_id)
+        return
+    threading.Thread(target=job, args=(app,), daemon=True).start()
+
+
+def _check_imap(config: EmailConfig) -> None:
+    # A parked session only comes back after a successful NOOP; otherwise
+    # the pool logs in again, which is what the test has to prove.
+    with get_connection(config):
+        pass
+
+
+def _check_smtp(config: EmailConfig) -> None:
+    with get_smtp(config) as server:
+        server.noop()
+
+
+def _run_connection_test(check, config: EmailConfig) -> None:
+    # The pools allow slow servers more time than a settings click should wait.
+    future = _connection_tests.submit(check, config)
+    # wait() instead of result(timeout=...): since Python 3.11 the executor's
+    # TimeoutError is the one socket timeouts raise inside the check itself.
+    done, _ = wait((future,), timeout=CONNECTION_TEST_TIMEOUT)
+    if not done:
+        raise TimeoutError(f"pas de réponse après {CONNECTION_TEST_TIMEOUT} s")
+    future.result()
+
+
 def _parse_hour(value: str | None, default: int) -> int:
     try:
         parsed = int(value) if value is not None else default
@@ -67,7 +121,16 @@ def _parse_minute(value: str | None, default: int) -> int:
 @bp.before_app_request
 def load_logged_in_user():
     user_id = session.get("user_id")
-    g.user = User.query.get(user_id) if user_id else None
+    if not user_id or request.endpoint == "static":
+        g.user = None
+        return
+    g.user = db.session.get(User, user_id)
+
+
+@bp.after_app_request
+def commit_pending_logs(response):
+    flush_logs()
+    return response
 
 
 @bp.route("/login", methods=["GET", "POST"])
@@ -75,8 +138,8 @@ def login():
     if request.method == "POST":
         username = request.form.get("username", "").strip()
         password = request.form.get("password", "")
-        user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
+        user = User.authenticate(username, password)
+        if user:
             session["user_id"] = user.id
             flash("Connexion réussie.", "success")
             next_page = request.args.get("next") or url_for("main.index")
@@ -98,11 +161,15 @@ def logout():
 @bp.route("/")
 @login_required
 def index():
-    clients = Client.query.order_by(Client.name).all()
+    # Plain rows: the dashboard only reads these columns, so no ORM instances.
+    clients = db.session.execute(select(*REPORT_COLUMNS).order_by(Client.name)).all()
     config = EmailConfig.get_singleton()
     window_label = format_window_label(config)
     return render_template(
-        "index.html", clients=clients, statuses=STATUS_CHOICES, window_label=window_label
+        "index.html",
+        clients=clients,
+        status_classes=STATUS_BADGE_CLASSES,
+        window_label=window_label,
     )
 
 
@@ -120,15 +187,14 @@ def new_client():
         else:
             client = Client(
                 name=name,
-                expected_subject=subject_ok,
                 expected_subject_ok=subject_ok,
                 expected_subject_warning=subject_warning,
                 expected_subject_failed=subject_failed,
                 last_status=STATUS_MISSING,
             )
             db.session.add(client)
-            db.session.commit()
             add_log(f"Client '{name}' créé par {g.user.username}.")
+            db.session.commit()
             flash("Client créé avec succès.", "success")
             return redirect(url_for("main.index"))
     return render_template("client_form.html", client=None)
@@ -137,31 +203,48 @@ def new_client():
 @bp.route("/clients/<int:client_id>/edit", methods=["GET", "POST"])
 @login_required
 def edit_client(client_id: int):
-    client = Client.query.get_or_404(client_id)
     if request.method == "POST":
-        client.name = request.form.get("name", "").strip()
+        name = request.form.get("name", "").strip()
         subject_ok = request.form.get("expected_subject_ok", "").strip()
         subject_warning = request.form.get("expected_subject_warning", "").strip()
         subject_failed = request.form.get("expected_subject_failed", "").strip()
 
-        client.expected_subject = subject_ok
-        client.expected_subject_ok = subject_ok
-        client.expected_subject_warning = subject_warning
-        client.expected_subject_failed = subject_failed
+        # Straight UPDATE: the row does not need loading just to be overwritten.
+        result = db.session.execute(
+            update(Client)
+            .where(Client.id == client_id)
+            .values(
+                name=name,
+                expected_subject_ok=subject_ok,
+                expected_subject_warning=subject_warning,
+                expected_subject_failed=subject_failed,
+            )
+        )
+        if result.rowcount == 0:
+            abort(404)
+        add_log(f"Client '{name}' mis à jour par {g.user.username}.")
         db.session.commit()
-        add_log(f"Client '{client.name}' mis à jour par {g.user.username}.")
         flash("Client mis à jour.", "success")
         return redirect(url_for("main.index"))
+    client = Client.query.get_or_404(client_id)
     return render_template("client_form.html", client=client)
 
 
 @bp.route("/clients/<int:client_id>/delete", methods=["POST"])
 @login_required
 def delete_client(client_id: int):
-    client = Client.query.get_or_404(client_id)
-    db.session.delete(client)
+    statement = delete(Client).where(Client.id == client_id)
+    if db.engine.dialect.delete_returning:
+        name = db.session.execute(statement.returning(Client.name)).scalar()
+    else:
+        # MySQL has no DELETE ... RETURNING, so the name is read first.
+        name = db.session.execute(select(Client.name).where(Client.id == client_id)).scalar()
+        if name is not None:
+            db.session.execute(statement)
+    if name is None:
+        abort(404)
+    add_log(f"Client '{name}' supprimé par {g.user.username}.")
     db.session.commit()
-    add_log(f"Client '{client.name}' supprimé par {g.user.username}.")
     flash("Client supprimé.", "success")
     return redirect(url_for("main.index"))
 
@@ -169,29 +252,42 @@ def delete_client(client_id: int):
 @bp.route("/clients/export", methods=["GET"])
 @login_required
 def export_clients():
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "name",
-        "expected_subject_ok",
-        "expected_subject_warning",
-        "expected_subject_failed",
-    ])
-    for client in Client.query.order_by(Client.name).all():
+    query = (
+        select(
+            Client.name,
+            Client.expected_subject_ok,
+            Client.expected_subject_warning,
+            Client.expected_subject_failed,
+        )
+        .order_by(Client.name)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
         writer.writerow([
-            client.name,
-            client.expected_subject_ok or "",
-            client.expected_subject_warning or "",
-            client.expected_subject_failed or "",
+            "name",
+            "expected_subject_ok",
+            "expected_subject_warning",
+            "expected_subject_failed",
         ])
+        # One encoded chunk per fetched batch rather than one per row; csv
+        # writes NULL subjects as empty fields.
+        for partition in db.session.execute(query).partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
 
-    response = current_app.response_class(
-        output.getvalue(),
+    add_log(f"Export des clients effectué par {g.user.username}.")
+    return current_app.response_class(
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment; filename=clients.csv"},
     )
-    add_log(f"Export des clients effectué par {g.user.username}.")
-    return response
 
 
 @bp.route("/clients/import", methods=["POST"])
@@ -202,41 +298,47 @@ def import_clients():
         flash("Merci de sélectionner un fichier CSV.", "error")
         return redirect(url_for("main.index"))
 
-    try:
-        stream = io.StringIO(uploaded.stream.read().decode("utf-8"))
-    except Exception:  # noqa: BLE001
-        flash("Impossible de lire le fichier fourni.", "error")
-        return redirect(url_for("main.index"))
-
-    reader = csv.DictReader(stream)
-    existing_names = {client.name.lower() for client in Client.query.all()}
+    # Rows are decoded and parsed lazily from the spooled upload.
+    reader = csv.DictReader(io.TextIOWrapper(uploaded.stream, encoding="utf-8", newline=""))
+    existing_names = {name.lower() for (name,) in db.session.query(Client.name)}
     created = 0
     skipped = 0
+    batch = []
 
-    for row in reader:
-        name = (row.get("name") or "").strip()
-        if not name:
-            continue
-        if name.lower() in existing_names:
-            skipped += 1
-            continue
-
-        client = Client(
-            name=name,
-            expected_subject_ok=(row.get("expected_subject_ok") or "").strip(),
-            expected_subject_warning=(row.get("expected_subject_warning") or "").strip(),
-            expected_subject_failed=(row.get("expected_subject_failed") or "").strip(),
-            expected_subject=(row.get("expected_subject_ok") or "").strip(),
-            last_status=STATUS_MISSING,
-        )
-        db.session.add(client)
-        existing_names.add(name.lower())
-        created += 1
+    try:
+        for row in reader:
+            name = (row.get("name") or "").strip()
+            if not name:
+                continue
+            if name.lower() in existing_names:
+                skipped += 1
+                continue
+
+            subject_ok = (row.get("expected_subject_ok") or "").strip()
+            batch.append(
+                {
+                    "name": name,
+                    "expected_subject_ok": subject_ok,
+                    "expected_subject_warning": (row.get("expected_subject_warning") or "").strip(),
+                    "expected_subject_failed": (row.get("expected_subject_failed") or "").strip(),
+                    "last_status": STATUS_MISSING,
+                }
+            )
+            existing_names.add(name.lower())
+            created += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                db.session.bulk_insert_mappings(Client, batch)
+                batch.clear()
+    except (UnicodeDecodeError, csv.Error):
+        db.session.rollback()
+        flash("Impossible de lire le fichier fourni.", "error")
+        return redirect(url_for("main.index"))
 
-    db.session.commit()
+    db.session.bulk_insert_mappings(Client, batch)
     add_log(
         f"Import de clients réalisé par {g.user.username}: {created} ajoutés, {skipped} ignorés."
     )
+    db.session.commit()
     flash(f"Import terminé : {created} ajouté(s), {skipped} ignoré(s).", "success")
     return redirect(url_for("main.index"))
 
@@ -307,9 +409,13 @@ def settings():
         config.check_window_end_hour = _parse_hour(
             request.form.get("check_window_end_hour"), end_hour_default
         )
-        db.session.commit()
-        configure_jobs(current_app._get_current_object())
+        schedule = config.schedule_settings()
         add_log(f"Configuration e-mail mise à jour par {g.user.username}.")
+        db.session.commit()
+        if current_app.config["RUN_SCHEDULER"]:
+            from .scheduler import configure_jobs
+
+            configure_jobs(current_app._get_current_object(), schedule)
         flash("Configuration mise à jour.", "success")
         return redirect(url_for("main.settings"))
     return render_template("settings.html", config=config)
@@ -326,14 +432,8 @@ def test_imap_connection():
         flash(message, "error")
         return redirect(url_for("main.settings"))
 
-    mail = None
     try:
-        if config.use_ssl:
-            mail = imaplib.IMAP4_SSL(config.imap_host, config.imap_port, timeout=10)
-        else:
-            mail = imaplib.IMAP4(config.imap_host, config.imap_port, timeout=10)
-        mail.login(config.imap_username, config.imap_password)
-        mail.select("INBOX")
+        _run_connection_test(_check_imap, config)
         message = "Test IMAP réussi."
         add_log(f"{message} par {g.user.username}.")
         if request.accept_mimetypes.accept_json:
@@ -345,12 +445,6 @@ def test_imap_connection():
         if request.accept_mimetypes.accept_json:
             return jsonify({"success": False, "message": message}), 500
         flash(message, "error")
-    finally:
-        if mail:
-            try:
-                mail.logout()
-            except Exception:  # noqa: BLE001
-                pass
 
     return redirect(url_for("main.settings"))
 
@@ -371,19 +465,8 @@ def test_smtp_connection():
         flash(message, "error")
         return redirect(url_for("main.settings"))
 
-    server = None
     try:
-        use_ssl_direct = config.use_ssl and config.smtp_port == 465
-        if use_ssl_direct:
-            server = smtplib.SMTP_SSL(config.smtp_host, config.smtp_port, timeout=10)
-        else:
-            server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=10)
-            if config.use_ssl:
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-        server.login(config.smtp_username, config.smtp_password)
-        server.noop()
+        _run_connection_test(_check_smtp, config)
         message = "Test SMTP réussi."
         add_log(f"{message} par {g.user.username}.")
         if request.accept_mimetypes.accept_json:
@@ -395,12 +478,6 @@ def test_smtp_connection():
         if request.accept_mimetypes.accept_json:
             return jsonify({"success": False, "message": message}), 500
         flash(message, "error")
-    finally:
-        if server:
-            try:
-                server.quit()
-            except Exception:  # noqa: BLE001
-                pass
 
     return redirect(url_for("main.settings"))
 
@@ -408,7 +485,7 @@ def test_smtp_connection():
 @bp.route("/run-check", methods=["POST"])
 @login_required
 def run_check():
-    run_email_checks()
+    _run_in_background(run_email_checks, "manual-email-check")
     flash("Vérification lancée.", "success")
     return redirect(url_for("main.index"))
 
@@ -416,8 +493,8 @@ def run_check():
 @bp.route("/send-report", methods=["POST"])
 @login_required
 def send_report():
-    success, message = send_status_report()
-    flash(message, "success" if success else "error")
+    _run_in_background(send_status_report, "manual-report-email")
+    flash("Envoi du rapport lancé. Le résultat apparaîtra dans les journaux.", "success")
     return redirect(url_for("main.index"))
 
 
@@ -437,8 +514,8 @@ def change_password():
             flash("La confirmation ne correspond pas.", "error")
         else:
             g.user.set_password(new_password)
-            db.session.commit()
             add_log(f"Mot de passe mis à jour pour l'utilisateur {g.user.username}.")
+            db.session.commit()
             flash("Mot de passe mis à jour.", "success")
             return redirect(url_for("main.index"))
     return render_template("change_password.html")
@@ -447,5 +524,11 @@ def change_password():
 @bp.route("/logs")
 @login_required
 def logs():
-    entries = LogEntry.query.order_by(LogEntry.created_at.desc()).limit(200).all()
-    return render_template("logs.html", entries=entries)
+    query = LogEntry.query
+    before = request.args.get("before", type=int)
+    if before:
+        query = query.filter(LogEntry.id < before)
+    # Keyset paging on the primary key stays cheap however deep the page.
+    entries = query.order_by(LogEntry.id.desc()).limit(LOGS_PAGE_SIZE + 1).all()
+    older = entries[LOGS_PAGE_SIZE - 1].id if len(entries) > LOGS_PAGE_SIZE else None
+    return render_template("logs.html", entries=entries[:LOGS_PAGE_SIZE], older=older)
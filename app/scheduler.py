@@ -1,11 +1,23 @@
 import atexit
+import os
+from datetime import timedelta
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 
 from .email_service import run_email_checks, send_status_report
 
 scheduler = BackgroundScheduler(timezone="Europe/Paris")
 
+DEFAULT_LOG_RETENTION_DAYS = 30
+
+
+def get_log_retention_days() -> int:
+    try:
+        return int(os.getenv("LOG_RETENTION_DAYS", DEFAULT_LOG_RETENTION_DAYS))
+    except ValueError:
+        return DEFAULT_LOG_RETENTION_DAYS
+
 
 def _sanitize_hour(value: int | None, default: int) -> int:
     try:
@@ -23,38 +35,50 @@ def _sanitize_minute(value: int | None, default: int) -> int:
     return max(0, min(59, minute))
 
 
-def configure_jobs(app):
+def purge_old_logs(app) -> None:
+    from .models import current_time, purge_logs
+
+    days = get_log_retention_days()
+    if days <= 0:
+        return
+    with app.app_context():
+        purge_logs(current_time() - timedelta(days=days))
+
+
+def _schedule_daily(app, job_id: str, func, hour: int, minute: int) -> None:
+    trigger = CronTrigger(hour=hour, minute=minute, timezone=scheduler.timezone)
+    job = scheduler.get_job(job_id)
+    # Saving the settings without touching the schedule leaves the job alone.
+    if job and job.args == (app,) and str(job.trigger) == str(trigger):
+        return
+    scheduler.add_job(func, trigger, args=(app,), id=job_id, replace_existing=True)
+
+
+def configure_jobs(app, schedule: dict | None = None):
     from .models import EmailConfig
 
     if not scheduler.running:
         scheduler.start()
 
-    config = EmailConfig.get_singleton()
-    check_hour = _sanitize_hour(config.check_schedule_hour, 9)
-    check_minute = _sanitize_minute(config.check_schedule_minute, 0)
-    scheduler.add_job(
-        lambda: run_email_checks(app),
-        "cron",
-        hour=check_hour,
-        minute=check_minute,
-        id="daily-email-check",
-        replace_existing=True,
-    )
-
-    report_hour = _sanitize_hour(config.report_schedule_hour, 9)
-    report_minute = _sanitize_minute(config.report_schedule_minute, 30)
-    report_job = scheduler.get_job("daily-report-email")
-    if config.auto_report_enabled:
-        scheduler.add_job(
-            lambda: send_status_report(app),
-            "cron",
-            hour=report_hour,
-            minute=report_minute,
-            id="daily-report-email",
-            replace_existing=True,
-        )
-    elif report_job:
-        scheduler.remove_job(report_job.id)
+    if schedule is None:
+        schedule = EmailConfig.get_singleton().schedule_settings()
+    check_hour = _sanitize_hour(schedule["check_schedule_hour"], 9)
+    check_minute = _sanitize_minute(schedule["check_schedule_minute"], 0)
+    _schedule_daily(app, "daily-email-check", run_email_checks, check_hour, check_minute)
+
+    report_hour = _sanitize_hour(schedule["report_schedule_hour"], 9)
+    report_minute = _sanitize_minute(schedule["report_schedule_minute"], 30)
+    if schedule["auto_report_enabled"]:
+        _schedule_daily(app, "daily-report-email", send_status_report, report_hour, report_minute)
+    elif scheduler.get_job("daily-report-email"):
+        scheduler.remove_job("daily-report-email")
+
+    _schedule_daily(app, "daily-log-retention", purge_old_logs, 3, 0)
+
+
+def run_job_now(app, job, job_id: str) -> None:
+    # A second click while the same job is still pending replaces it.
+    scheduler.add_job(job, "date", args=(app,), id=job_id, replace_existing=True)
 
 
 def init_scheduler(app):
@@ -0,0 +1,78 @@
+import atexit
+import ssl
+import threading
+import time
+from typing import Any, Callable
+
+# Shared by every IMAP and SMTP connection, with the settings imaplib and
+# smtplib build when given no context: encrypted, without certificate
+# verification.
+SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+SSL_CONTEXT.check_hostname = False
+SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+
+# Logged-in sessions parked between uses, keyed by connection settings.
+class SessionPool:
+    def __init__(
+        self,
+        open_session: Callable[[Any], Any],
+        close_session: Callable[[Any], None],
+        drop_session: Callable[[Any], None],
+        probe: Callable[[Any], bool],
+        key: Callable[[Any], tuple],
+        idle_timeout: float,
+        max_idle: int | None = None,
+    ) -> None:
+        self._open = open_session
+        self._close = close_session
+        self._drop = drop_session
+        self._probe = probe
+        self._key = key
+        self._idle_timeout = idle_timeout
+        self._max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list[tuple[Any, float]]] = {}
+        atexit.register(self.close_all)
+
+    def _evict_idle(self, now: float) -> list[Any]:
+        expired = []
+        for key, sessions in list(self._idle.items()):
+            # Sessions are parked in order, so the expired ones sit at the front.
+            while sessions and now - sessions[0][1] > self._idle_timeout:
+                expired.append(sessions.pop(0)[0])
+            if not sessions:
+                del self._idle[key]
+        return expired
+
+    def checkout(self, config) -> Any:
+        key = self._key(config)
+        while True:
+            with self._lock:
+                expired = self._evict_idle(time.monotonic())
+                sessions = self._idle.get(key)
+                session = sessions.pop()[0] if sessions else None
+            # Idle or unresponsive sessions may be half-open: a polite LOGOUT or
+            # QUIT could block until the socket timeout before any work starts.
+            for stale in expired:
+                self._drop(stale)
+            if session is None:
+                return self._open(config)
+            if self._probe(session):
+                return session
+            self._drop(session)
+
+    def checkin(self, config, session: Any) -> None:
+        with self._lock:
+            sessions = self._idle.setdefault(self._key(config), [])
+            if self._max_idle is None or len(sessions) < self._max_idle:
+                sessions.append((session, time.monotonic()))
+                return
+        self._close(session)
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = [session for entries in self._idle.values() for session, _ in entries]
+            self._idle.clear()
+        for session in sessions:
+            self._close(session)
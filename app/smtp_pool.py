@@ -0,0 +1,93 @@
+import smtplib
+from contextlib import contextmanager
+from typing import Iterator
+
+from .models import EmailConfig
+from .session_pool import SSL_CONTEXT, SessionPool
+
+# Kept well below the idle cutoff most SMTP servers apply to open sessions.
+SMTP_IDLE_TIMEOUT = 100
+SMTP_MAX_IDLE = 5
+SMTP_TIMEOUT = 10
+
+
+def open_smtp(config: EmailConfig) -> smtplib.SMTP:
+    use_ssl_direct = config.use_ssl and config.smtp_port == 465
+    if use_ssl_direct:
+        server = smtplib.SMTP_SSL(
+            config.smtp_host, config.smtp_port, timeout=SMTP_TIMEOUT, context=SSL_CONTEXT
+        )
+    else:
+        server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=SMTP_TIMEOUT)
+        if config.use_ssl:
+            server.ehlo()
+            server.starttls(context=SSL_CONTEXT)
+            server.ehlo()
+    try:
+        server.login(config.smtp_username, config.smtp_password)
+    except Exception:
+        close_smtp(server)
+        raise
+    return server
+
+
+def close_smtp(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def drop_smtp(server: smtplib.SMTP) -> None:
+    try:
+        server.close()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def connection_key(config: EmailConfig) -> tuple:
+    return (
+        config.smtp_host,
+        config.smtp_port,
+        config.smtp_username,
+        config.smtp_password,
+        config.use_ssl,
+    )
+
+
+def _is_alive(server: smtplib.SMTP) -> bool:
+    try:
+        status, _ = server.noop()
+    except (smtplib.SMTPException, OSError):
+        return False
+    return status == 250
+
+
+_pool = SessionPool(
+    open_smtp,
+    close_smtp,
+    drop_smtp,
+    _is_alive,
+    connection_key,
+    SMTP_IDLE_TIMEOUT,
+    SMTP_MAX_IDLE,
+)
+
+
+@contextmanager
+def get_smtp(config: EmailConfig) -> Iterator[smtplib.SMTP]:
+    server = _pool.checkout(config)
+    try:
+        yield server
+    except (smtplib.SMTPServerDisconnected, OSError):
+        close_smtp(server)
+        raise
+    except Exception:
+        # A refused message leaves the session itself usable.
+        _pool.checkin(config, server)
+        raise
+    _pool.checkin(config, server)
+
+
+def close_all() -> None:
+    _pool.close_all()